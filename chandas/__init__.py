@@ -1,10 +1,31 @@
+import threading
+
 from chandas import syllabize
-from chandas.svat.data import metrical_data
-from chandas.svat.identify import identifier
 
-metrical_data.InitializeData()
-svat_identifier = identifier.Identifier(metrical_data=metrical_data)
+_identifier = None
+_identifier_lock = threading.Lock()
+
+
+def _get_identifier():
+  """The shared Identifier, building the metrical data on first use rather than at import."""
+  global _identifier
+  if _identifier is None:
+    with _identifier_lock:
+      if _identifier is None:
+        # Imported here, so that importing chandas just to syllabize does not load them.
+        from chandas.svat.data import metrical_data
+        from chandas.svat.identify import identifier
+        _identifier = identifier.Identifier(metrical_data=metrical_data)
+  return _identifier
+
+
+def __getattr__(name):
+  # Keeps chandas.svat_identifier working, without paying for it at import.
+  if name == 'svat_identifier':
+    return _get_identifier()
+  raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
 
 def to_pattern_lines(input_lines):
-  pattern_lines = ["".join(syllabize.to_weight_list(line)) for line in input_lines]
+  pattern_lines = ["".join(weights) for weights in syllabize.to_weight_lists(input_lines)]
   return pattern_lines
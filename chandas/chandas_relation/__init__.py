@@ -3,40 +3,39 @@ from __future__ import unicode_literals
 import sys, os
 sys.path.append(os.path.abspath('..'))
 from chandas import syllabize
-import unicodecsv
-import codecs
+import csv
 
 def count_mAtrAs(pattern_str):
-  graphemes = syllabize.get_graphemes(pattern_str)
-  mAtrA_count = 0
-  for grapheme in graphemes:
-    if grapheme == 'द':
-      mAtrA_count = mAtrA_count + 1
-    if grapheme == 'दा':
-      mAtrA_count = mAtrA_count + 2
-  return mAtrA_count
+  """Count mAtrA-s in a pattern such as "दा दा द द दा", where द is laghu and दा is guru."""
+  # Every दा also contains a द, so the difference counts the bare laghu-s.
+  guru_count = pattern_str.count('दा')
+  return guru_count * 2 + (pattern_str.count('द') - guru_count)
 
 # def removeNonAscii(s): return "".join(filter(lambda x: ord(x)<128, s))
-def get_common_prefix(strings):
-  b = zip(*map(lambda x:   syllabize.get_graphemes(x), strings))
-  from itertools import takewhile
-  prefix_tuples = takewhile(lambda x: x[0]*len(x) == "".join(x), b)
-  result = " ".join(x[0] for x in prefix_tuples)
-  return result
+def _common_leading_graphemes(grapheme_sequences):
+  common = []
+  for graphemes in zip(*grapheme_sequences):
+    if any(grapheme != graphemes[0] for grapheme in graphemes[1:]):
+      break
+    common.append(graphemes[0])
+  return common
 
-def _reverse(string):
-  return string[::-1]
+def get_common_prefix(strings):
+  grapheme_lists = [syllabize.get_graphemes(x) for x in strings]
+  return " ".join(_common_leading_graphemes(grapheme_lists))
 
 def get_common_suffix(strings):
-  s = get_common_prefix(map(_reverse, strings))
-  return _reverse(s)
+  # Walk the grapheme lists from the tail, rather than reversing the strings, which would break up graphemes.
+  grapheme_lists = [syllabize.get_graphemes(x) for x in strings]
+  suffix = _common_leading_graphemes(reversed(graphemes) for graphemes in grapheme_lists)
+  return " ".join(reversed(suffix))
 
 if __name__ == '__main__':
   data_file = u'data/Chandas छन्दः - सम.csv'
   sama_file = u'data/sama_mAtrA.csv'
   
-  with open(data_file, 'r') as csvfile, codecs.open(sama_file, 'w', 'utf-8') as outfile:
-    chandas_reader =  unicodecsv.reader(csvfile, encoding='utf-8')
+  with open(data_file, 'r', encoding='utf-8', newline='') as csvfile, open(sama_file, 'w', encoding='utf-8', newline='') as outfile:
+    chandas_reader =  csv.reader(csvfile)
     for chandas in chandas_reader:
       mAtrA_count = count_mAtrAs(chandas[3])
       print(mAtrA_count)
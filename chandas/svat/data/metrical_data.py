@@ -10,9 +10,15 @@ try: unicode
 except NameError: unicode = str
 
 import itertools
+import json
 import re
 import unicodedata
 
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
 
 """
 What is a metre? When are two metres the same?
@@ -52,18 +58,32 @@ Adding a new metre:
  - Populate indexes: perfect, full, ardha1-2, pada1-4: they all map pattern -> [ids]
 """
 
+# Patterns of laghu-s and guru-s, with '.' for either syllable in _LGDOT_RE.
+_LG_RE = re.compile(r'^[LG]*$')
+_LGDOT_RE = re.compile(r'^[LG.]*$')
+
+_LG_TO_BITS = str.maketrans('LG', '01')
+_BIT_TO_LG = str.maketrans('01', 'LG')
+
+def PatternKey(pattern):
+    """The pattern packed into an int, one bit per syllable (1 for G), under which it is stored in known_*_patterns.
+
+    A leading 1 bit marks the pattern length, so that leading L-s survive.
+    Raises ValueError if the pattern has characters other than L and G.
+    """
+    # int() alone would also accept underscores, whitespace and non-ASCII digits.
+    if not _LG_RE.fullmatch(pattern):
+        raise ValueError('Not a pattern of L and G: %r' % pattern)
+    return int('1' + pattern.translate(_LG_TO_BITS), 2)
+
 def to_short_url(pattern):
-    assert re.match(r'^[LG]*$', pattern), pattern
-    h = hex(int('1' + pattern.replace('L', '0').replace('G', '1'), 2))
-    assert h.startswith('0x')
-    if h.endswith('L'): h = h[:-1]
-    return h[2:]
+    assert _LG_RE.match(pattern), pattern
+    return format(PatternKey(pattern), 'x')
 
 def from_short_url(shorturl):
     assert shorturl[0] != '0', shorturl
-    b = bin(int(shorturl, 16))
-    assert b.startswith('0b1')
-    return b[3:].replace('0', 'L').replace('1', 'G')
+    # Drop the leading 1 bit that marks the length.
+    return format(int(shorturl, 16), 'b')[1:].translate(_BIT_TO_LG)
 
 
 known_full_patterns = {}
@@ -80,11 +100,18 @@ all_data = {}
 
 video_for_metre = {}
 
+_SOURCE_FILES = ['ganesh.json', 'curated.json', 'vrttaratnakara.json', 'mishra.json']
+
+def _DataPath(filename):
+  return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+
 def jsonToPy(filename):
-  """Reads JSON from a file, and puts it into a similar data structure as before."""
-  ret = []
-  import json
-  data = json.load(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)))
+  """Reads JSON from a file, and yields (metre_name, pattern) pairs, in a similar structure as before."""
+  with open(_DataPath(filename), 'rb') as json_file:
+    raw = json_file.read()
+  # orjson is optional; it parses these files several times faster than json.
+  data = orjson.loads(raw) if orjson else json.loads(raw.decode('utf-8'))
   assert data.keys() <= {'comment', 'metres'}
   for metre_name, metre_value in data['metres']:
     if isinstance(metre_value, dict):
@@ -95,34 +122,32 @@ def jsonToPy(filename):
       metre_value = metre_value['pattern']
     if isinstance(metre_value, unicode) and metre_value.startswith('TODO'):
       continue
-    ret.append((metre_name, metre_value))
-  return ret
+    yield (metre_name, metre_value)
 
 
 def GetPattern(metre):
   return pattern_for_metre.get(metre)
 
 
-def _RemoveChars(input_string, chars):
-  """Wrapper function because string.translate != unicode.translate."""
-  # logging.debug('input_string is ', input_string.encode('utf-8'))
-  for char in chars:
-    input_string = input_string.replace(char, '')
-  return input_string
+# The spaces and dashes that separate groups of syllables in metre descriptions.
+_REMOVE_SEPARATORS = str.maketrans('', '', unicodedata.lookup('SPACE') + unicodedata.lookup('EM DASH') + unicodedata.lookup('EN DASH'))
+
+def _RemoveSeparators(input_string):
+  return input_string.translate(_REMOVE_SEPARATORS)
 
 
 def _CleanUpPattern(pattern):
-  pattern = _RemoveChars(pattern, [unicodedata.lookup('SPACE'), unicodedata.lookup('EM DASH'), unicodedata.lookup('EN DASH')])
-  assert re.match(r'^[LG.]*$', pattern), pattern
+  pattern = _RemoveSeparators(pattern)
+  assert _LGDOT_RE.match(pattern), pattern
   return pattern
 
 
 def _CleanUpSimpleRegex(regex):
-  regex = _RemoveChars(regex, [unicodedata.lookup('SPACE'), unicodedata.lookup('EM DASH'), unicodedata.lookup('EN DASH')])
+  regex = _RemoveSeparators(regex)
   # TODO(shreevatsa): Make this work. Why does this regex have to be simple?
   # regex = regex.replace('4', '(LLLL|GLL|LGL|LLG|GG)')
   regex = regex.replace('4', '')
-  assert re.match(r'^[LG.]*$', regex), regex
+  assert _LGDOT_RE.match(regex), regex
   return regex
 
 
@@ -141,22 +166,38 @@ def _AddPatternForMetre(metre_name, pada_patterns):
 
 
 def _AddFullPattern(full_pattern, metre_name):
-  if full_pattern in known_full_patterns:
+  if '.' in full_pattern:
+    # Input patterns are all L/G, so could never equal this one.
+    return False
+  key = PatternKey(full_pattern)
+  if key in known_full_patterns:
     # TODO(shreevatsa): Figure out what exactly to do in this case
     # logging.debug('Error: full pattern already present')
     # logging.debug(metre_name)
     # logging.debug(full_pattern)
-    # logging.debug(known_full_patterns[full_pattern])
+    # logging.debug(known_full_patterns[key])
     return False
-  assert full_pattern not in known_full_patterns
-  known_full_patterns[full_pattern] = {metre_name: True}
+  known_full_patterns[key] = {metre_name: True}
   return True
 
+# which_halves and which_padas are bitmasks: bit k-1 is set if the pattern can be half (or pāda) k.
+# For example, 0b0101 for pāda-s 1 and 3.
+def DecodeWhich(which):
+  """The set of halves (or pāda-s) in a which_halves (or which_padas) bitmask."""
+  return {k for k in range(1, 5) if which >> (k - 1) & 1}
+
 def _AddHalfPattern(half_pattern, metre_name, which_halves):
-  known_half_patterns.setdefault(half_pattern, {}).setdefault(metre_name, set()).update(which_halves)
+  if '.' in half_pattern:
+    # Input patterns are all L/G, so could never equal this one.
+    return
+  matches = known_half_patterns.setdefault(PatternKey(half_pattern), {})
+  matches[metre_name] = matches.get(metre_name, 0) | which_halves
 
 def _AddPadaPattern(pada_pattern, metre_name, which_padas):
-  known_pada_patterns.setdefault(pada_pattern, {}).setdefault(metre_name, set()).update(which_padas)
+  if '.' in pada_pattern:
+    return
+  matches = known_pada_patterns.setdefault(PatternKey(pada_pattern), {})
+  matches[metre_name] = matches.get(metre_name, 0) | which_padas
 
 def _AddSamavrttaPattern(metre_name, each_pada_pattern):
   """Given a sama-vṛtta metre's pattern, add it to the data structures."""
@@ -166,15 +207,15 @@ def _AddSamavrttaPattern(metre_name, each_pada_pattern):
 
   patterns = [clean[:-1] + 'G', clean[:-1] + 'L']
   for (a, b, c, d) in itertools.product(patterns, repeat=4): _AddFullPattern(a + b + c + d, metre_name)
-  for (a, b) in itertools.product(patterns, repeat=2): _AddHalfPattern(a + b, metre_name, {1, 2})
-  for a in patterns: _AddPadaPattern(a, metre_name, {1, 2, 3, 4})
+  for (a, b) in itertools.product(patterns, repeat=2): _AddHalfPattern(a + b, metre_name, 0b0011)
+  for a in patterns: _AddPadaPattern(a, metre_name, 0b1111)
 
 
 def _AddArdhasamavrttaPattern(metre_name, odd_and_even_pada_patterns):
   """Given an ardha-sama-vṛtta's pattern, add it."""
   (odd_pada_pattern, even_pada_pattern) = odd_and_even_pada_patterns
   clean_odd = _CleanUpPattern(odd_pada_pattern)
-  assert re.match(r'^[LG]*$', clean_odd)
+  assert _LG_RE.match(clean_odd), clean_odd
   clean_even = _CleanUpPattern(even_pada_pattern)
   # if clean_even.endswith('L'):
   #   logging.debug('Not adding %s for now, as %s ends with laghu' % (metre_name, clean_even))
@@ -185,16 +226,16 @@ def _AddArdhasamavrttaPattern(metre_name, odd_and_even_pada_patterns):
   patterns_odd = [clean_odd[:-1] + 'G', clean_odd[:-1] + 'L']
   patterns_even = [clean_even[:-1] + 'G', clean_even[:-1] + 'L']
   for (a, b, c, d) in itertools.product(patterns_odd, patterns_even, repeat=2): _AddFullPattern(a + b + c + d, metre_name)
-  for (a, b) in itertools.product(patterns_odd, patterns_even): _AddHalfPattern(a + b, metre_name, {1, 2})
-  for a in patterns_odd: _AddPadaPattern(a, metre_name, {1, 3})
-  for b in patterns_even: _AddPadaPattern(b, metre_name, {2, 4})
+  for (a, b) in itertools.product(patterns_odd, patterns_even): _AddHalfPattern(a + b, metre_name, 0b0011)
+  for a in patterns_odd: _AddPadaPattern(a, metre_name, 0b0101)
+  for b in patterns_even: _AddPadaPattern(b, metre_name, 0b1010)
 
 
 def _AddVishamavrttaPattern(metre_name, pada_patterns):
   """Given the four pāda-s of a viṣama-vṛtta, add the metre."""
   assert len(pada_patterns) == 4
   pada_patterns = [_CleanUpPattern(p) for p in pada_patterns]
-  for p in pada_patterns: assert re.match(r'^[LG.]*$', p)
+  assert _LGDOT_RE.match(''.join(pada_patterns)), pada_patterns
   (pa, pb, pc, pd) = pada_patterns
   # assert pb.endswith('G')
   # assert pd.endswith('G')
@@ -205,12 +246,12 @@ def _AddVishamavrttaPattern(metre_name, pada_patterns):
   patterns_c = [pc]
   patterns_d = [pd[:-1] + 'G', pd[:-1] + 'L']
   for (a, b, c, d) in itertools.product(patterns_a, patterns_b, patterns_c, patterns_d): _AddFullPattern(a + b + c + d, metre_name)
-  for (a, b) in itertools.product(patterns_a, patterns_b): _AddHalfPattern(a + b, metre_name, {1})
-  for (c, d) in itertools.product(patterns_c, patterns_d): _AddHalfPattern(c + d, metre_name, {2})
-  for a in patterns_a: _AddPadaPattern(a, metre_name, {1})
-  for b in patterns_b: _AddPadaPattern(b, metre_name, {2})
-  for c in patterns_c: _AddPadaPattern(c, metre_name, {3})
-  for d in patterns_d: _AddPadaPattern(d, metre_name, {4})
+  for (a, b) in itertools.product(patterns_a, patterns_b): _AddHalfPattern(a + b, metre_name, 0b0001)
+  for (c, d) in itertools.product(patterns_c, patterns_d): _AddHalfPattern(c + d, metre_name, 0b0010)
+  for a in patterns_a: _AddPadaPattern(a, metre_name, 0b0001)
+  for b in patterns_b: _AddPadaPattern(b, metre_name, 0b0010)
+  for c in patterns_c: _AddPadaPattern(c, metre_name, 0b0100)
+  for d in patterns_d: _AddPadaPattern(d, metre_name, 0b1000)
 
 
 def _AddFullRegex(full_verse_regex, metre_name):
@@ -229,8 +270,8 @@ def _AddSamavrttaRegex(metre_name, pada_regex):
   """Add a sama-vṛtta's regex (full, half, pāda). No variants."""
   pada_regex = _CleanUpSimpleRegex(pada_regex)
   _AddFullRegex(''.join('(%s)' % s for s in [pada_regex] * 4), metre_name)
-  _AddHalfRegex(''.join('(%s)' % s for s in [pada_regex] * 2), metre_name, {1, 2})
-  _AddPadaRegex(pada_regex, metre_name, {1, 2, 3, 4})
+  _AddHalfRegex(''.join('(%s)' % s for s in [pada_regex] * 2), metre_name, 0b0011)
+  _AddPadaRegex(pada_regex, metre_name, 0b1111)
 
 
 def _AddMetreRegex(metre_name, pada_regexes, simple=True):
@@ -250,9 +291,9 @@ def _AddAnustup():
   half_regex = regex_ac + regex_bd
 
   _AddFullRegex(half_regex * 2, metre_name)
-  _AddHalfRegex(half_regex, metre_name, {1, 2})
-  _AddPadaRegex(regex_ac, metre_name, {1, 3})
-  _AddPadaRegex(regex_bd, metre_name, {2, 4})
+  _AddHalfRegex(half_regex, metre_name, 0b0011)
+  _AddPadaRegex(regex_ac, metre_name, 0b0101)
+  _AddPadaRegex(regex_bd, metre_name, 0b1010)
 
 
 def _AddAnustupExamples():
@@ -279,27 +320,35 @@ def _AddAnustupExamples():
 
 
 def _MatraCount(pattern):
-  assert re.match('^[LG]*$', pattern)
-  return sum(2 if c == 'G' else 1 for c in pattern)
+  assert _LG_RE.match(pattern), pattern
+  # Each G counts as 2 and each L as 1.
+  return len(pattern) + pattern.count('G')
 
 
 def _PatternsOfLength(n):
-  if n in _patterns_memo:
-    return _patterns_memo[n]
-  _patterns_memo[n] = [p + 'L' for p in _PatternsOfLength(n - 1)]
-  _patterns_memo[n] += [p + 'G' for p in _PatternsOfLength(n - 2)]
+  """Patterns of n mātrā-s, as (length, bits) pairs in which a set bit is a G."""
+  for m in range(len(_patterns_memo), n + 1):
+    _patterns_memo[m] = ([(l + 1, v << 1) for (l, v) in _patterns_memo[m - 1]] +
+                         [(l + 1, (v << 1) | 1) for (l, v) in _patterns_memo[m - 2]])
   return _patterns_memo[n]
-_patterns_memo = {0: [''], 1: ['L']}
+_patterns_memo = {0: [(0, 0)], 1: [(1, 0)]}
+
+
+def _PatternFromBits(length, bits):
+  if not length:
+    return ''
+  return format(bits, '0%db' % length).translate(_BIT_TO_LG)
 
 
 def _LoosePatternsOfLength(n):
+  """Regex alternation of the patterns of n mātrā-s, allowing a final L for a G."""
   if n in _loose_patterns_memo:
     return _loose_patterns_memo[n]
-  _loose_patterns_memo[n] = (_PatternsOfLength(n) +
-                             [p for p in _PatternsOfLength(n - 1)
-                              if p.endswith('L')])
+  patterns = _PatternsOfLength(n) + [(l, v) for (l, v) in _PatternsOfLength(n - 1)
+                                     if l and not v & 1]
+  _loose_patterns_memo[n] = '|'.join(_PatternFromBits(l, v) for (l, v) in patterns)
   return _loose_patterns_memo[n]
-_loose_patterns_memo = {0: [''], 1: ['L']}
+_loose_patterns_memo = {0: '', 1: 'L'}
 
 
 def _AddAryaFamilyRegex():
@@ -324,10 +373,10 @@ def _AddAryaFamilyRegex():
   _AddMetreRegex('Āryāgīti',
                  [pada_12_re, pada_20_re, pada_12_re, pada_20_re], simple=False)
   _AddMetreRegex('Āryā (loose schema)',
-                 ['|'.join(_LoosePatternsOfLength(12)),
-                  '|'.join(_LoosePatternsOfLength(18)),
-                  '|'.join(_LoosePatternsOfLength(12)),
-                  '|'.join(_LoosePatternsOfLength(15))],
+                 [_LoosePatternsOfLength(12),
+                  _LoosePatternsOfLength(18),
+                  _LoosePatternsOfLength(12),
+                  _LoosePatternsOfLength(15)],
                  simple=False)
 
 
@@ -347,14 +396,12 @@ def _AddGiti(pada_patterns):
   _AddMetreRegex('Gīti', pada_patterns, simple=False)
 
 
-def InitializeData():
+def _BuildData():
   """Add all known metres to the data structures."""
   _AddAnustup()
   _AddAnustupExamples()
 
-  sources = sum((jsonToPy(filename)
-                   for filename in ['ganesh.json', 'curated.json', 'vrttaratnakara.json', 'mishra.json']),
-                [])
+  sources = itertools.chain.from_iterable(jsonToPy(filename) for filename in _SOURCE_FILES)
 
   _AddAryaFamilyRegex()
   vrtta_data = sources
@@ -369,7 +416,7 @@ def InitializeData():
       regex_or_pattern = 'pattern'
     else:
       samatva = 'sama'
-      if re.match(r'^[LG]*$', _RemoveChars(description, ' —–')):
+      if _LG_RE.match(_RemoveSeparators(description)):
         regex_or_pattern = 'pattern'
       else:
         regex_or_pattern = 'regex'
@@ -390,6 +437,16 @@ def InitializeData():
       assert False, name
 
 
+def InitializeData():
+  """Add all known metres to the data structures.
+
+  Does nothing if they have already been added, so it is safe to call more than once.
+  """
+  if all_data:
+    return
+  _BuildData()
+
+
 def HtmlDescription(name):
   if name not in all_data:
     return '[No description currently for %s]' % name
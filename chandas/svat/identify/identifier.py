@@ -22,6 +22,7 @@ class Identifier(object):
   def __init__(self, metrical_data):
     self._Reset()
     self.metrical_data = metrical_data
+    self.metrical_data.InitializeData()
     logging.info('Identifier is initialized. It knows %d full regexes, %d full patterns, %d half regexes, %d half patterns, %d pada regexes, %d pada patterns',
                   len(self.metrical_data.known_full_regexes), len(self.metrical_data.known_full_patterns),
                   len(self.metrical_data.known_half_regexes), len(self.metrical_data.known_half_patterns),
@@ -54,20 +55,24 @@ class Identifier(object):
           ret.setdefault(match_type, OrderedSet()).add(metre_name)
         for (metre_name, value) in matches_for_part.get('half', {}).items():
           match_type = _MatchTypeHalf(input_type, part_type, value)
-          self.parts_debug.append(' %s %s match for: %s %s' % (' ' * last_debug_line_length, match_type, metre_name, value))
+          self.parts_debug.append(' %s %s match for: %s %s' % (' ' * last_debug_line_length, match_type, metre_name, self.metrical_data.DecodeWhich(value)))
           ret.setdefault(match_type, OrderedSet()).add(metre_name)
         for (metre_name, value) in matches_for_part.get('pada', {}).items():
           match_type = _MatchTypePada(input_type, part_type, value)
-          self.parts_debug.append(' %s %s match for: %s %s' % (' ' * last_debug_line_length, match_type, metre_name, value))
+          self.parts_debug.append(' %s %s match for: %s %s' % (' ' * last_debug_line_length, match_type, metre_name, self.metrical_data.DecodeWhich(value)))
           ret.setdefault(match_type, OrderedSet()).add(metre_name)
     # Done looping over all part types.
     return ret
 
   def _MatchesFor(self, pattern, input_type, part_type, debug_indentation_depth):
+    try:
+      key = self.metrical_data.PatternKey(pattern)
+    except ValueError:
+      key = None
     ret = {
-      'full': _MatchesIn(pattern, self.metrical_data.known_full_patterns, self.metrical_data.known_full_regexes),
-      'half': _MatchesIn(pattern, self.metrical_data.known_half_patterns, self.metrical_data.known_half_regexes),
-      'pada': _MatchesIn(pattern, self.metrical_data.known_pada_patterns, self.metrical_data.known_pada_regexes)
+      'full': _MatchesIn(pattern, key, self.metrical_data.known_full_patterns, self.metrical_data.known_full_regexes),
+      'half': _MatchesIn(pattern, key, self.metrical_data.known_half_patterns, self.metrical_data.known_half_regexes),
+      'pada': _MatchesIn(pattern, key, self.metrical_data.known_pada_patterns, self.metrical_data.known_pada_regexes)
     }
     assert type(ret.get('full', {})) == dict
     assert type(ret.get('half', {})) == dict
@@ -75,10 +80,11 @@ class Identifier(object):
     return ret
 
 
-def _MatchesIn(pattern, known_patterns, known_regexes):
-  if pattern in known_patterns:
-    assert type(known_patterns[pattern]) == dict
-    return known_patterns[pattern]
+def _MatchesIn(pattern, key, known_patterns, known_regexes):
+  """The matches for pattern, whose PatternKey is key (None if it is not an L/G pattern)."""
+  if key in known_patterns:
+    assert type(known_patterns[key]) == dict
+    return known_patterns[key]
   for (regex, matches) in known_regexes:
     if regex.match(pattern):
       assert type(matches) == dict
@@ -94,8 +100,9 @@ def _MatchTypeFull(input_type, part_type):
 
 
 def _MatchTypeHalf(input_type, part_type, value):
-  if (input_type == 'full' and (part_type == 'half_1' and 1 in value or
-                                part_type == 'half_2' and 2 in value) or
+  """value is a bitmask of the halves the pattern can be (bit 0 for the first)."""
+  if (input_type == 'full' and (part_type == 'half_1' and value & 0b01 or
+                                part_type == 'half_2' and value & 0b10) or
       input_type == 'half' and part_type == 'full'):
     return 'partial'
   else:
@@ -103,12 +110,13 @@ def _MatchTypeHalf(input_type, part_type, value):
 
 
 def _MatchTypePada(input_type, part_type, value):
-  if (input_type == 'full' and (part_type == 'pada_1' and 1 in value or
-                                part_type == 'pada_2' and 2 in value or
-                                part_type == 'pada_3' and 3 in value or
-                                part_type == 'pada_4' and 4 in value) or
-     (input_type == 'half' and (part_type == 'half_1' and (1 in value or 3 in value) or
-                                part_type == 'half_2' and (2 in value or 4 in value))) or
+  """value is a bitmask of the pāda-s the pattern can be (bit 0 for the first)."""
+  if (input_type == 'full' and (part_type == 'pada_1' and value & 0b0001 or
+                                part_type == 'pada_2' and value & 0b0010 or
+                                part_type == 'pada_3' and value & 0b0100 or
+                                part_type == 'pada_4' and value & 0b1000) or
+     (input_type == 'half' and (part_type == 'half_1' and value & 0b0101 or
+                                part_type == 'half_2' and value & 0b1010)) or
       input_type == 'pada' and part_type == 'full'):
     return 'partial'
   else:
@@ -249,4 +257,5 @@ def _Parts(pattern_lines):
          ]
 
 def _MatraCount(pattern):
-  return sum(2 if c == 'G' else 1 for c in pattern)
+  # Each G counts as 2 and each L as 1.
+  return len(pattern) + pattern.count('G')
@@ -68,7 +68,7 @@ def debug_rejected_characters(orig_line, rejects):
     assert isinstance(char, unicode)
     return '[U+%04x]' % ord(char)
   assert isinstance(orig_line, unicode)
-  if not rejects:
+  if not rejects or not logging.getLogger().isEnabledFor(logging.DEBUG):
     return
   line_read_as = ''.join(_unicode_notation(c) if c in rejects else c for c in orig_line)
   rejects = [(c, _unicode_notation(c), unicodedata.name(c, 'Unknown')) for c in rejects]
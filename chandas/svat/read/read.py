@@ -52,11 +52,13 @@ def read_text(text):
   text = _preprocess_for_transliteration(text)
   (cleaned_lines, display_lines) = _transliterate_into_lines(text)
 
-  debug_output = ['Input read as:']
-  for (number, display_line) in enumerate(display_lines):
-    transliterated = sanscript.transliterate(display_line)
-    debug_output.append('Line %d: %s' % (number + 1, transliterated))
-  debug_output.append('')
-  logging.debug('\n'.join(debug_output))
+  # Transliterating every line back is costly, so only do it when the output is shown.
+  if logging.getLogger().isEnabledFor(logging.DEBUG):
+    debug_output = ['Input read as:']
+    for (number, display_line) in enumerate(display_lines):
+      transliterated = sanscript.transliterate(display_line)
+      debug_output.append('Line %d: %s' % (number + 1, transliterated))
+    debug_output.append('')
+    logging.debug('\n'.join(debug_output))
 
   return (cleaned_lines, display_lines)
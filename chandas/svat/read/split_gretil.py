@@ -116,8 +116,7 @@ def find_verse_in_text(verse, text):
 
 def individual_blocks_of_verses_in_text(verses, text):
   """Splits text into blocks of text; each block is (text, should_highlight)."""
-  while verses:
-    verse = verses.pop(0)
+  for verse in verses:
     consumed = 0
     for block in find_verse_in_text(verse, text):
       consumed += len(block[0])
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import itertools
 import logging
 
 import regex
@@ -6,35 +7,81 @@ import regex
 from indic_transliteration import sanscript
 
 
+# Extended grapheme clusters, as per Unicode text segmentation rules (see get_graphemes for the regex version).
+_GRAPHEME_RE = regex.compile(r"\X")
+
+_DEV = sanscript.SCHEMES[sanscript.DEVANAGARI]
+
+_VSV_JOIN = _DEV.do_vyanjana_svara_join
+
+
+def _chars_in(char_class):
+  """The characters of a regex character class, as a set. Only the Devanagari (and Vedic and Devanagari Extensions) blocks are looked at."""
+  class_re = regex.compile("[%s]" % char_class)
+  return frozenset(char for char in map(chr, itertools.chain(range(0x0900, 0x0980), range(0x1CD0, 0x1D00), range(0xA8E0, 0xA900))) if class_re.match(char))
+
+
+# For has_vowel and begins_with_vowel, which look at single characters.
+# PATTERN_DEPENDENT_VOWEL has a stray space in it, which is not a vowel.
+_VOWEL_CHARS = _chars_in(_DEV.PATTERN_INDEPENDENT_VOWEL + _DEV.PATTERN_DEPENDENT_VOWEL.replace(" ", ""))
+_VYANJANA_CHARS = _chars_in(_DEV.PATTERN_VYANJANA)
+_BEGINS_WITH_VOWEL_CHARS = _chars_in("ऄ-औॲ-ॷ")
+# Spelt out by _clean, with a plain str.replace each (cheaper than a regex pass, as they are rare).
+_OM_CHARS = sorted(_chars_in(_DEV.PATTERN_OM))
+# Cannot do \P{Letter} below as it does not match mAtra-s and virAma-s as of 2019.
+# ऀ-़ा-ॣॲ-ॿ
+_SYLLABLE_CHARS = "%s%s%s%s%s%s" % (_DEV.PATTERN_INDEPENDENT_VOWEL, _DEV.PATTERN_VYANJANA, _DEV.PATTERN_DEPENDENT_VOWEL, _DEV.PATTERN_YOGAVAAHA, _DEV.PATTERN_ACCENT, _DEV.PATTERN_CONSONANT_MODIFIER)
+# Drop the stray space of PATTERN_DEPENDENT_VOWEL, so that spaces get cleaned away with the rest.
+_SYLLABLE_CHARS = _SYLLABLE_CHARS.replace(" ", "")
+# Strips everything else (spaces, punctuation, ...) in one pass, a run at a time.
+_CLEAN_RE = regex.compile(r"[^%s]+" % _SYLLABLE_CHARS, flags=regex.UNICODE)
+# Separates lines which are syllabized together in to_weight_lists.
+_LINE_SEPARATOR = "\u001F"
+_CLEAN_LINES_RE = regex.compile(r"[^%s%s]+" % (_SYLLABLE_CHARS, _LINE_SEPARATOR), flags=regex.UNICODE)
+_VY_SV_JOIN_RE = regex.compile(r"(%s)([%s])" % (_DEV.PATTERN_VYANJANA_WITHOUT_VOWEL, _DEV.PATTERN_INDEPENDENT_VOWEL))
+# possible vyanjanas without vowels + svara or vyanjana + possible vowel marks + possible yogavAhas + possible accents + possible vyanjanas without vowels
+_SYLL_RE = regex.compile(r"(?:%s)*[%s%s]़?[%s]*[%s]*[%s]*(?:%sँ?)*" % (_DEV.PATTERN_VYANJANA_WITHOUT_VOWEL, _DEV.PATTERN_INDEPENDENT_VOWEL, _DEV.PATTERN_VYANJANA, _DEV.PATTERN_DEPENDENT_VOWEL, _DEV.PATTERN_YOGAVAAHA, _DEV.PATTERN_ACCENT, _DEV.PATTERN_VYANJANA_WITHOUT_VOWEL, ))
+# For to_weight_lists: the syllables of all the lines, and the separators between the lines.
+_SYLL_OR_LINE_SEPARATOR_RE = regex.compile(r"%s|%s" % (_SYLL_RE.pattern, _LINE_SEPARATOR))
+# For get_syllable_weight: long vowels (and their signs) and yogavAha-s, and a vowel followed by a consonant.
+_GURU_CHARS = _chars_in(_DEV.PATTERN_GURU_INDEPENDENT_VOWEL + _DEV.PATTERN_GURU_DEPENDENT_VOWEL + _DEV.PATTERN_GURU_YOGAVAAHA)
+_CODA_RE = regex.compile(r"[%s%s]़?[%s]*[%s]*[%s]*(?:%s)+" % (_DEV.PATTERN_INDEPENDENT_VOWEL, _DEV.PATTERN_VYANJANA, _DEV.PATTERN_DEPENDENT_VOWEL, _DEV.PATTERN_YOGAVAAHA, _DEV.PATTERN_ACCENT, _DEV.PATTERN_VYANJANA_WITHOUT_VOWEL, ))
+
+
 def get_graphemes(in_string):
   """ Split a devanAgarI and possibly other strings into graphemes.
   
   Example: assert syllabize.get_graphemes(u"बिक्रममेरोनामहो") == "बि क्र म मे रो ना म हो".split(" ")
+
+  Conjuncts (क्ष) are kept together by the Unicode 15.1 segmentation rules, which regex implements from 2024.7.24.
   :param in_string: 
   :return: 
   """
-  import icu
-  break_iterator = icu.BreakIterator.createCharacterInstance(icu.Locale())
-  break_iterator.setText(in_string)
-  i = 0
-  graphemes = []
-  for j in break_iterator:
-    s = in_string[i:j]
-    graphemes.append(s)
-    i = j
-  return graphemes
+  return _GRAPHEME_RE.findall(in_string)
 
 def is_vyanjanaanta(in_string):
   return in_string.endswith("्") or in_string.endswith("य्ँ") or in_string.endswith("व्ँ") or in_string.endswith("ल्ँ")
 
 
 def has_vowel(in_string):
-  dev_scheme = sanscript.SCHEMES[sanscript.DEVANAGARI]
-  return bool(regex.findall("[%s%s]" % (dev_scheme.PATTERN_INDEPENDENT_VOWEL, dev_scheme.PATTERN_DEPENDENT_VOWEL), in_string, flags=regex.UNICODE) or regex.match(".*[%s](?=([^्]|$))" % (dev_scheme.PATTERN_VYANJANA), in_string, flags=regex.UNICODE))
+  """Whether there is a vowel (sign), or a consonant not followed by a virAma and so carrying the inherent a."""
+  for (i, char) in enumerate(in_string):
+    if char in _VOWEL_CHARS or (char in _VYANJANA_CHARS and in_string[i + 1:i + 2] != "्"):
+      return True
+  return False
 
 
 def begins_with_vowel(in_string):
-  return bool(regex.fullmatch(r"[ऄ-औॲ-ॷ].*", in_string, flags=regex.UNICODE))
+  return in_string[:1] in _BEGINS_WITH_VOWEL_CHARS
+
+
+def _clean(in_string, clean_re):
+  cleaned_phrase  = in_string
+  for om in _OM_CHARS:
+    cleaned_phrase = cleaned_phrase.replace(om, "ओम्")
+  cleaned_phrase = clean_re.sub("", cleaned_phrase)
+  cleaned_phrase = _VY_SV_JOIN_RE.sub(lambda x: _VSV_JOIN(x.group(1), x.group(2)), cleaned_phrase)
+  return cleaned_phrase
 
 
 def get_syllables(in_string):
@@ -44,41 +91,58 @@ def get_syllables(in_string):
   :param in_string: 
   :return: 
   """
-  # Cannot do \P{Letter} below as it does not match mAtra-s and virAma-s as of 2019.
-  # ऀ-़ा-ॣॲ-ॿ
-
-  dev_scheme = sanscript.SCHEMES[sanscript.DEVANAGARI]
-  cleaned_phrase  = in_string
-  cleaned_phrase = regex.sub("[%s]" % dev_scheme.PATTERN_OM, "ओम्", cleaned_phrase)
-  cleaned_phrase = regex.sub(r"([^%s%s%s%s%s%s])" % (dev_scheme.PATTERN_INDEPENDENT_VOWEL, dev_scheme.PATTERN_VYANJANA, dev_scheme.PATTERN_DEPENDENT_VOWEL, dev_scheme.PATTERN_YOGAVAAHA, dev_scheme.PATTERN_ACCENT, dev_scheme.PATTERN_CONSONANT_MODIFIER), "", cleaned_phrase, flags=regex.UNICODE)
-  cleaned_phrase = cleaned_phrase.replace(" ", "")
-  cleaned_phrase = regex.sub(r"(%s)([%s])" % (dev_scheme.PATTERN_VYANJANA_WITHOUT_VOWEL, dev_scheme.PATTERN_INDEPENDENT_VOWEL), lambda x: sanscript.SCHEMES[sanscript.DEVANAGARI].do_vyanjana_svara_join(x.group(1), x.group(2)), cleaned_phrase)
-  syllables = []
-  while len(cleaned_phrase) > 0:
-    # possible vyanjanas without vowels + svara or vyanjana + possible vowel marks + possible yogavAhas + possible accents + possible vyanjanas without vowels
-    match = regex.match((r"(%s)*[%s%s]़?[%s]*[%s]*[%s]*(%sँ?)*" % (dev_scheme.PATTERN_VYANJANA_WITHOUT_VOWEL,dev_scheme.PATTERN_INDEPENDENT_VOWEL, dev_scheme.PATTERN_VYANJANA, dev_scheme.PATTERN_DEPENDENT_VOWEL, dev_scheme.PATTERN_YOGAVAAHA, dev_scheme.PATTERN_ACCENT, dev_scheme.PATTERN_VYANJANA_WITHOUT_VOWEL, )), cleaned_phrase)
-    if match is None:
-      message = "No match! Input - %s Remaining - %s" % (in_string, cleaned_phrase)
-      logging.fatal(message)
-      raise ValueError(message)
-    current_syllable = match.group(0)
-    cleaned_phrase = cleaned_phrase.replace(match.group(0), "", 1)
-    if len(current_syllable) > 0:
-      syllables.append(current_syllable)
+  cleaned_phrase = _clean(in_string, _CLEAN_RE)
+  syllables = _SYLL_RE.findall(cleaned_phrase)
+  # Syllables are never empty, so they cover the whole phrase (with nothing skipped in between) iff their lengths add up.
+  if sum(map(len, syllables)) != len(cleaned_phrase):
+    end = 0
+    for syllable in syllables:
+      if not cleaned_phrase.startswith(syllable, end):
+        break
+      end += len(syllable)
+    message = "No match! Input - %s Remaining - %s" % (in_string, cleaned_phrase[end:])
+    logging.fatal(message)
+    raise ValueError(message)
   return syllables
 
 
 def get_syllable_weight(syllable):
-  dev_scheme = sanscript.SCHEMES[sanscript.DEVANAGARI]
-  if regex.findall(r"[%s%s%s]" % (dev_scheme.PATTERN_GURU_INDEPENDENT_VOWEL, dev_scheme.PATTERN_GURU_DEPENDENT_VOWEL, dev_scheme.PATTERN_GURU_YOGAVAAHA), syllable):
-    return "G"
-  elif regex.findall(r"[%s%s]़?[%s]*[%s]*[%s]*(%s)+" % (dev_scheme.PATTERN_INDEPENDENT_VOWEL, dev_scheme.PATTERN_VYANJANA, dev_scheme.PATTERN_DEPENDENT_VOWEL, dev_scheme.PATTERN_YOGAVAAHA, dev_scheme.PATTERN_ACCENT, dev_scheme.PATTERN_VYANJANA_WITHOUT_VOWEL, ), syllable):
+  """ G if the syllable has a long vowel or a yogavAha, or a vowel followed by a consonant; else L.
+  
+  :param syllable: As split by get_syllables (a consonant cluster can only end it after its vowel).
+  :return: 
+  """
+  if not _GURU_CHARS.isdisjoint(syllable):
     return "G"
-  else:
-    return "L"
+  # A consonant without its vowel needs a virAma; most syllables have none, and can skip the search.
+  return "G" if "्" in syllable and _CODA_RE.search(syllable) else "L"
 
 
 def to_weight_list(line_in):
-  syllables = get_syllables(line_in)
-  return [get_syllable_weight(syllable) for syllable in syllables]
-  
\ No newline at end of file
+  return [get_syllable_weight(syllable) for syllable in get_syllables(line_in)]
+
+
+def to_weight_lists(lines_in):
+  """ Same as [to_weight_list(line) for line in lines_in], but cleans and splits all the lines in one go.
+  
+  :param lines_in: 
+  :return: 
+  """
+  lines_in = list(lines_in)
+  if len(lines_in) < 2:
+    return [to_weight_list(line) for line in lines_in]
+  joined = _LINE_SEPARATOR.join(lines_in)
+  if joined.count(_LINE_SEPARATOR) != len(lines_in) - 1:
+    return [to_weight_list(line) for line in lines_in]
+  cleaned_lines = _clean(joined, _CLEAN_LINES_RE)
+  tokens = _SYLL_OR_LINE_SEPARATOR_RE.findall(cleaned_lines)
+  if sum(map(len, tokens)) != len(cleaned_lines):
+    # Something is neither a syllable nor a line separator: let the offending line raise the usual error.
+    return [to_weight_list(line) for line in lines_in]
+  weight_lists = [[]]
+  for token in tokens:
+    if token == _LINE_SEPARATOR:
+      weight_lists.append([])
+    else:
+      weight_lists[-1].append(get_syllable_weight(token))
+  return weight_lists
@@ -75,8 +75,8 @@ setup(
     # Specify the Python versions you support here. In particular, ensure
     # that you indicate whether you support Python 2, Python 3 or both.
     'Programming Language :: Python :: 3',
-    'Programming Language :: Python :: 3.6',
-    'Programming Language :: Python :: 3.7',
+    'Programming Language :: Python :: 3.8',
+    'Programming Language :: Python :: 3.9',
   ],
 
   # What does your project relate to?
@@ -95,6 +95,8 @@ setup(
   # requirements files see:
   # https://packaging.python.org/en/latest/requirements.html
   install_requires=install_reqs,
+  # For the regex releases that keep conjuncts together in \X.
+  python_requires='>=3.8',
 
   # List additional groups of dependencies here (e.g. development
   # dependencies). You can install these using the following syntax,
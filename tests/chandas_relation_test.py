@@ -0,0 +1,13 @@
+import pytest
+
+from chandas import chandas_relation
+
+
+@pytest.mark.parametrize("strings, suffix", [
+    # The whole of the first string is a suffix of the second.
+    (["द दा दा", "दा द दा दा"], "द   दा   दा"),
+    # The last दा of each must not be split into its vowel sign and द.
+    (["ददा", "दादा"], "दा"),
+])
+def test_get_common_suffix(strings, suffix):
+    assert chandas_relation.get_common_suffix(strings) == suffix
@@ -33,4 +33,11 @@ def test_svat_id(test_case):
     id_result = chandas.svat_identifier.IdentifyFromPatternLines(pattern_lines)
     assert 'exact' in id_result, id_result
     exact_matches = [sanscript.transliterate(metre.lower(), _from=sanscript.IAST, _to=sanscript.DEVANAGARI) for metre in id_result['exact'].keys()]
-    assert exact_matches == test_case["exactMatches"], id_result
\ No newline at end of file
+    assert exact_matches == test_case["exactMatches"], id_result
+
+
+@pytest.mark.parametrize("pattern", ["L_G", "L١", "LG\n", " LG", "L.G"])
+def test_pattern_key_rejects_non_lg(pattern):
+    from chandas.svat.data import metrical_data
+    with pytest.raises(ValueError):
+        metrical_data.PatternKey(pattern)
@@ -28,12 +28,26 @@ def test_graphemes():
     assert syllabize.get_graphemes(u"बिक्रममेरोनामहो") == "बि क्र म मे रो ना म हो".split(" ")
 
 
+@pytest.mark.parametrize("test_case, graphemes", [
+    ("क्षत्रिय", "क्ष त्रि य"),
+    ("सत्त्वं", "स त्त्वं"),
+])
+def test_graphemes_segmentation(test_case, graphemes):
+    assert syllabize.get_graphemes(test_case) == graphemes.split(" ")
+
+
 @pytest.mark.parametrize("test_case", [x for x in test_data["syllableExtractionTests"] if "weightsString" in x])
 def test_get_syllable_weight(test_case):
     logging.debug(str(test_case))
     assert syllabize.to_weight_list(test_case["phrase"]) == test_case["weightsString"].split(" ")
 
 
+# Strings without a vowel before the final consonant are not guru, even though they end in a virAma.
+@pytest.mark.parametrize("test_case, weight", [("मत्", "G"), ("तल्ँ", "G"), ("ब्", "L"), ("्", "L"), ("ल्ँ", "L")])
+def test_get_syllable_weight_of_consonant_ending(test_case, weight):
+    assert syllabize.get_syllable_weight(test_case) == weight
+
+
 @pytest.mark.parametrize("test_case", test_data["syllableExtractionTests"])
 def test_syllables(test_case):
     logging.debug(str(test_case))
@@ -58,3 +72,16 @@ def test_not_is_vyanjanAnta(test_case):
     assert not syllabize.is_vyanjanaanta(test_case)
 
 
+@pytest.mark.parametrize("lines", [
+    [],
+    ["रामः"],
+    ["रामो राजमणिः सदा विजयते", "रामं रमेशं भजे"],
+    ["रा\u001fम", "सीता"],
+])
+def test_to_weight_lists(lines):
+    assert syllabize.to_weight_lists(lines) == [syllabize.to_weight_list(line) for line in lines]
+
+
+def test_to_weight_lists_unparsable_line():
+    with pytest.raises(ValueError):
+        syllabize.to_weight_lists(["रामः", "abcऀx"])